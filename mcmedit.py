@@ -22,12 +22,24 @@ The encoder never emits value 3.
 from __future__ import annotations
 
 import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterable, List
 
+import numpy as np
 from PIL import Image
 
+# Optional Numba kernels. Importing numba costs more than a whole NumPy run on one
+# font, so it is opt-in (MCMEDIT_NUMBA=1) for batch/CI use.
+njit = None
+if os.environ.get("MCMEDIT_NUMBA") == "1":
+    try:
+        from numba import njit
+    except ImportError:
+        pass
+
 GLYPH_W = 12
 GLYPH_H = 18
 GRID = 16
@@ -37,7 +49,6 @@ GLYPHS = 256
 
 BYTES_PER_GLYPH = 64
 DATA_BYTES_PER_GLYPH = 54
-PADDING_BYTES = BYTES_PER_GLYPH - DATA_BYTES_PER_GLYPH  # 10
 
 # Exact palette (RGB)
 RGB_BLACK = (0, 0, 0)
@@ -50,6 +61,17 @@ VAL_BLACK = 0
 VAL_TRANSPARENT = 1
 VAL_WHITE = 2
 
+# Accepted input RGB -> 2-bit value
+RGB_TO_VAL = {
+    RGB_BLACK: VAL_BLACK,
+    RGB_GRAY: VAL_TRANSPARENT,
+    RGB_GREEN: VAL_TRANSPARENT,
+    RGB_WHITE: VAL_WHITE,
+}
+
+# 2-bit value -> display RGB (index with a value array)
+VAL_TO_RGB = np.array([RGB_BLACK, RGB_GRAY, RGB_WHITE], dtype=np.uint8)
+
 # Injection range
 INJECT_START = 0xA0
 INJECT_END = 0xFF
@@ -64,6 +86,12 @@ PRINTABLE_CHARS_LINES = [
 ]
 PRINTABLE_CHARS = "\n".join(PRINTABLE_CHARS_LINES) + "\n"
 
+# .mcm byte line for every byte value: b"00000000" .. b"11111111"
+_BIN8 = tuple(format(i, "08b").encode("ascii") for i in range(256))
+_BIN8_SET = frozenset(_BIN8)
+# Same, as a (256, 9) ASCII row table including the newline, for np.take
+_BIN8_LINES = np.frombuffer(b"".join(b + b"\n" for b in _BIN8), dtype=np.uint8).reshape(256, 9)
+
 
 USE_COLOR = sys.stderr.isatty() or sys.stdout.isatty()
 
@@ -83,9 +111,15 @@ def _err(msg: str, code: int = 2):
     raise SystemExit(code)
 
 
-def _read_mcm_text(path: Path) -> List[bytes]:
-    lines = path.read_text(encoding="ascii", errors="strict").splitlines()
-    if not lines or lines[0].strip() != "MAX7456":
+def _read_mcm_text(path: Path, skip_indices: Iterable[int] = ()) -> np.ndarray:
+    """
+    Return all glyphs as one (256, 64) uint8 array.
+
+    Glyphs in skip_indices still count towards the line total but are neither
+    validated nor parsed; their rows are left zeroed for the caller to overwrite.
+    """
+    lines = path.read_bytes().splitlines()
+    if not lines or lines[0].strip() != b"MAX7456":
         raise ValueError("Not a MAX7456 text .mcm file (missing 'MAX7456' header).")
 
     data_lines = lines[1:]
@@ -96,110 +130,197 @@ def _read_mcm_text(path: Path) -> List[bytes]:
             f"(256 glyphs * 64 bytes per glyph)."
         )
 
-    glyph_bytes: List[bytes] = []
-    for gi in range(GLYPHS):
-        chunk = data_lines[gi * BYTES_PER_GLYPH : (gi + 1) * BYTES_PER_GLYPH]
-        b = bytearray()
-        for s in chunk:
-            s = s.strip()
-            if len(s) != 8 or any(c not in "01" for c in s):
-                raise ValueError(f"Invalid byte line at glyph {gi}: {s!r}")
-            b.append(int(s, 2))
-        glyph_bytes.append(bytes(b))
+    skip = set(skip_indices)
+    keep = [gi for gi in range(GLYPHS) if gi not in skip]
+    if skip:
+        data_lines = [
+            s for gi in keep for s in data_lines[gi * BYTES_PER_GLYPH : (gi + 1) * BYTES_PER_GLYPH]
+        ]
+
+    widths = set(map(len, data_lines))
+    if widths != {8}:
+        # Tolerate stray whitespace around lines (slow path).
+        data_lines = [s.strip() for s in data_lines]
+        widths = set(map(len, data_lines))
+
+    bits = np.frombuffer(b"".join(data_lines), dtype=np.uint8) - ord("0")
+    if data_lines and (widths != {8} or (bits > 1).any()):
+        for li, s in enumerate(data_lines):
+            if s not in _BIN8_SET:
+                gi = keep[li // BYTES_PER_GLYPH]
+                raise ValueError(f"Invalid byte line at glyph {gi}: {s.decode('ascii', 'replace')!r}")
+
+    glyphs = np.zeros((GLYPHS, BYTES_PER_GLYPH), dtype=np.uint8)
+    glyphs[keep] = np.packbits(bits.reshape(len(keep), BYTES_PER_GLYPH, 8), axis=-1)[..., 0]
+    return glyphs
+
+
+def _write_mcm_text(glyphs: np.ndarray, out_mcm: Path) -> None:
+    """Write a (256, 64) uint8 glyph array as a text .mcm."""
+    if len(glyphs) != GLYPHS:
+        raise ValueError("Need exactly 256 glyphs to write .mcm")
+    if glyphs.shape != (GLYPHS, BYTES_PER_GLYPH):
+        raise ValueError("Glyph byte length mismatch while writing.")
+
+    rows = _BIN8_LINES.take(np.asarray(glyphs, dtype=np.uint8).ravel(), axis=0)
+    out_mcm.write_bytes(b"MAX7456\n" + rows.tobytes())
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _decode_batch(data, out):
+        """data: (N, 54) uint8 -> out: (N, 18, 12) uint8 values."""
+        for g in range(data.shape[0]):
+            for y in range(GLYPH_H):
+                bits24 = (data[g, y * 3] << 16) | (data[g, y * 3 + 1] << 8) | data[g, y * 3 + 2]
+                for x in range(GLYPH_W):
+                    v = (bits24 >> ((GLYPH_W - 1 - x) * 2)) & 0b11
+                    out[g, y, x] = VAL_WHITE if v == 3 else v
+
+    @njit(cache=True)
+    def _encode_batch(rgb, out):
+        """rgb: (N, 18, 12, 3) uint8 -> out: (N, 64) uint8 (zeroed).
+
+        Returns the flat pixel index of the first illegal color, or -1.
+        """
+        for g in range(rgb.shape[0]):
+            for y in range(GLYPH_H):
+                bits24 = 0
+                for x in range(GLYPH_W):
+                    px = (rgb[g, y, x, 0], rgb[g, y, x, 1], rgb[g, y, x, 2])
+                    if px == RGB_BLACK:
+                        v = VAL_BLACK
+                    elif px == RGB_WHITE:
+                        v = VAL_WHITE
+                    elif px == RGB_GRAY or px == RGB_GREEN:
+                        v = VAL_TRANSPARENT
+                    else:
+                        return (g * GLYPH_H + y) * GLYPH_W + x
+                    bits24 = (bits24 << 2) | v
+                out[g, y * 3] = (bits24 >> 16) & 0xFF
+                out[g, y * 3 + 1] = (bits24 >> 8) & 0xFF
+                out[g, y * 3 + 2] = bits24 & 0xFF
+        return -1
+
+else:
+    _decode_batch = None
+    _encode_batch = None
+
+
+def _decode_glyphs_to_values(glyphs: np.ndarray) -> np.ndarray:
+    """Decode an (N, 64) uint8 glyph array into an (N, 18, 12) uint8 array of 2-bit values."""
+    if glyphs.ndim != 2 or glyphs.shape[1] != BYTES_PER_GLYPH:
+        raise ValueError("Glyph size mismatch.")
+    data = np.ascontiguousarray(glyphs[:, :DATA_BYTES_PER_GLYPH])
+
+    if _decode_batch is not None:
+        vals = np.empty((len(glyphs), GLYPH_H, GLYPH_W), dtype=np.uint8)
+        _decode_batch(data, vals)
+        return vals
 
-    return glyph_bytes
+    # Each row is 24 bits = 12 pixels of 2 bits, MSB first.
+    bits = np.unpackbits(data, axis=1).reshape(len(glyphs), GLYPH_H, GLYPH_W, 2)
+    vals = (bits[..., 0] << 1) | bits[..., 1]
+    # If 3 appears, display as white; we won't emit 3 on encode.
+    return np.minimum(vals, VAL_WHITE)
 
 
-def _write_mcm_text(glyph_bytes: List[bytes], out_mcm: Path) -> None:
-    if len(glyph_bytes) != GLYPHS:
-        raise ValueError("Need exactly 256 glyphs to write .mcm")
+def _rgb_key(rgb) -> int:
+    r, g, b = rgb
+    return (r << 16) | (g << 8) | b
 
-    lines: List[str] = ["MAX7456"]
-    for g in glyph_bytes:
-        if len(g) != BYTES_PER_GLYPH:
-            raise ValueError("Glyph byte length mismatch while writing.")
-        for b in g:
-            lines.append(f"{b:08b}")
 
-    out_mcm.write_text("\n".join(lines) + "\n", encoding="ascii")
+def _rgb_to_val(rgb):
+    val = RGB_TO_VAL.get(tuple(rgb))
+    if val is None:
+        raise ValueError(
+            f"Illegal pixel color {rgb}. Allowed: black {RGB_BLACK}, gray {RGB_GRAY}, green {RGB_GREEN}, white {RGB_WHITE}."
+        )
+    return val
 
 
-def _decode_glyph_to_values(glyph64: bytes) -> List[int]:
-    """Return flat list of 12*18 2-bit values."""
-    if len(glyph64) != BYTES_PER_GLYPH:
-        raise ValueError("Glyph size mismatch.")
-    data = glyph64[:DATA_BYTES_PER_GLYPH]
-
-    vals: List[int] = [VAL_TRANSPARENT] * (GLYPH_W * GLYPH_H)
-    for y in range(GLYPH_H):
-        row = data[y * 3 : (y + 1) * 3]  # 24 bits
-        bits = int.from_bytes(row, "big")
-        for x in range(GLYPH_W):
-            shift = (GLYPH_W - 1 - x) * 2
-            v = (bits >> shift) & 0b11
-            # If 3 appears, display as white; we won't emit 3 on encode.
-            if v == 3:
-                v = VAL_WHITE
-            vals[y * GLYPH_W + x] = v
-    return vals
+def _encode_tiles_to_glyph_bytes(tiles: np.ndarray) -> np.ndarray:
+    """Encode an (N, 18, 12, 3) uint8 RGB array into an (N, 64) uint8 array of glyph bytes."""
+    n = tiles.shape[0]
+    if _encode_batch is not None:
+        out = np.zeros((n, BYTES_PER_GLYPH), dtype=np.uint8)
+        bad = _encode_batch(np.ascontiguousarray(tiles), out)
+        if bad >= 0:
+            _rgb_to_val(tuple(int(c) for c in tiles.reshape(-1, 3)[bad]))
+        return out
 
+    # Load each pixel as one big-endian 0x00RRGGBB word, then build the two bit
+    # planes of the 2-bit value with whole-array compares (cmpeq-style).
+    words = np.zeros(tiles.shape[:3] + (4,), dtype=np.uint8)
+    words[..., 1:] = tiles
+    keys = words.view(">u4")[..., 0]
 
-def _rgb_to_val(rgb):
-    if rgb == RGB_BLACK:
-        return VAL_BLACK
-    if rgb == RGB_WHITE:
-        return VAL_WHITE
-    if rgb == RGB_GRAY or rgb == RGB_GREEN:
-        return VAL_TRANSPARENT
-    raise ValueError(
-        f"Illegal pixel color {rgb}. Allowed: black {RGB_BLACK}, gray {RGB_GRAY}, green {RGB_GREEN}, white {RGB_WHITE}."
-    )
+    is_white = keys == _rgb_key(RGB_WHITE)
+    is_clear = (keys == _rgb_key(RGB_GRAY)) | (keys == _rgb_key(RGB_GREEN))
+    legal = is_white | is_clear | (keys == _rgb_key(RGB_BLACK))
+    if not legal.all():
+        # Report the first offending pixel, same as a per-pixel scan would.
+        _rgb_to_val(tuple(int(c) for c in tiles[tuple(np.argwhere(~legal)[0])]))
 
+    vals = (is_white.view(np.uint8) << 1) | is_clear.view(np.uint8)
 
-def _tile_to_glyph_bytes(tile_rgb: Image.Image) -> bytes:
-    """Encode one 12x18 RGB tile into 64 bytes (54 data + 10 padding)"""
-    if tile_rgb.size != (GLYPH_W, GLYPH_H):
-        raise ValueError(f"Tile must be {GLYPH_W}x{GLYPH_H}, got {tile_rgb.size}")
+    out = np.zeros((n, BYTES_PER_GLYPH), dtype=np.uint8)  # includes padding
+    out[:, :DATA_BYTES_PER_GLYPH] = _pack_values(vals)
+    return out
 
-    px = tile_rgb.load()
-    data = bytearray()
 
-    for y in range(GLYPH_H):
-        bits24 = 0
-        for x in range(GLYPH_W):
-            v = _rgb_to_val(px[x, y])  # 0/1/2 only
-            bits24 = (bits24 << 2) | (v & 0b11)
-        data.extend(bits24.to_bytes(3, "big"))
+def _pack_values(vals: np.ndarray) -> np.ndarray:
+    """Pack (N, 18, 12) 2-bit values into (N, 54) data bytes, 4 pixels per byte, MSB first.
 
-    # pad to 64 bytes
-    data.extend(b"\x00" * PADDING_BYTES)
-    return bytes(data)
+    SWAR: each uint64 holds 8 one-byte pixel lanes (little-endian, so lane 0 is
+    the leftmost pixel). Adjacent lanes are folded together twice, leaving one
+    finished output byte at the bottom of each 32-bit half.
+    """
+    n = vals.shape[0]
+    x = np.ascontiguousarray(vals, dtype=np.uint8).reshape(n, -1).view("<u8")
+    x = ((x & 0x00FF00FF00FF00FF) << 2) | ((x >> 8) & 0x00FF00FF00FF00FF)
+    x = ((x & 0x0000FFFF0000FFFF) << 4) | ((x >> 16) & 0x0000FFFF0000FFFF)
+
+    data = np.empty((n, DATA_BYTES_PER_GLYPH), dtype=np.uint8)
+    data[:, 0::2] = x & 0xFF
+    data[:, 1::2] = (x >> 32) & 0xFF
+    return data
+
+
+def _rgb_array(img: Image.Image) -> np.ndarray:
+    """View an RGB image's raw bytes as an (H, W, 3) uint8 array (one tobytes() call)."""
+    if img.mode != "RGB":
+        raise ValueError(f"Expected an RGB image, got mode {img.mode!r}.")
+    w, h = img.size
+    return np.frombuffer(img.tobytes(), dtype=np.uint8).reshape(h, w, 3)
+
+
+def _split_tiles(arr: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """Split an (rows*18, cols*12, 3) image array into (rows*cols, 18, 12, 3) tiles, row-major."""
+    return (
+        arr.reshape(rows, GLYPH_H, cols, GLYPH_W, 3)
+        .swapaxes(1, 2)
+        .reshape(rows * cols, GLYPH_H, GLYPH_W, 3)
+    )
 
 
-def mcm_to_sheet(mcm_path: Path, out_png: Path) -> None:
-    glyphs = _read_mcm_text(mcm_path)
+def _join_tiles(tiles: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """Inverse of _split_tiles: lay out (rows*cols, 18, 12, 3) tiles as one image array."""
+    return (
+        tiles.reshape(rows, cols, GLYPH_H, GLYPH_W, 3)
+        .swapaxes(1, 2)
+        .reshape(rows * GLYPH_H, cols * GLYPH_W, 3)
+    )
 
-    sheet = Image.new("RGB", (SHEET_W, SHEET_H), RGB_GRAY)
-    for gi, g in enumerate(glyphs):
-        vals = _decode_glyph_to_values(g)
 
-        tile = Image.new("RGB", (GLYPH_W, GLYPH_H), RGB_GRAY)
-        tpx = tile.load()
-        for y in range(GLYPH_H):
-            for x in range(GLYPH_W):
-                v = vals[y * GLYPH_W + x]
-                if v == VAL_BLACK:
-                    tpx[x, y] = RGB_BLACK
-                elif v == VAL_TRANSPARENT:
-                    tpx[x, y] = RGB_GRAY
-                else:
-                    tpx[x, y] = RGB_WHITE
+def mcm_to_sheet(mcm_path: Path, out_png: Path) -> None:
+    glyphs = _read_mcm_text(mcm_path)
 
-        sx = (gi % GRID) * GLYPH_W
-        sy = (gi // GRID) * GLYPH_H
-        sheet.paste(tile, (sx, sy))
+    vals = _decode_glyphs_to_values(glyphs)
+    sheet = _join_tiles(VAL_TO_RGB[vals], GRID, GRID)
 
-    sheet.save(out_png, optimize=False)
+    Image.fromarray(sheet, "RGB").save(out_png, optimize=False)
 
 
 def sheet_to_mcm(sheet_path: Path, out_mcm: Path) -> None:
@@ -207,22 +328,8 @@ def sheet_to_mcm(sheet_path: Path, out_mcm: Path) -> None:
     if img.size != (SHEET_W, SHEET_H):
         raise ValueError(f"Sheet must be exactly {SHEET_W}x{SHEET_H}, got {img.size}.")
 
-    px = img.load()
-
-    glyph_bytes: List[bytes] = []
-    for gi in range(GLYPHS):
-        sx = (gi % GRID) * GLYPH_W
-        sy = (gi // GRID) * GLYPH_H
-
-        tile = Image.new("RGB", (GLYPH_W, GLYPH_H))
-        tpx = tile.load()
-        for y in range(GLYPH_H):
-            for x in range(GLYPH_W):
-                tpx[x, y] = px[sx + x, sy + y]
-
-        glyph_bytes.append(_tile_to_glyph_bytes(tile))
-
-    _write_mcm_text(glyph_bytes, out_mcm)
+    tiles = _split_tiles(_rgb_array(img), GRID, GRID)
+    _write_mcm_text(_encode_tiles_to_glyph_bytes(tiles), out_mcm)
 
 
 def inject_logo(base_mcm: Path, logo_png: Path, out_mcm: Path) -> None:
@@ -237,8 +344,47 @@ def inject_logo(base_mcm: Path, logo_png: Path, out_mcm: Path) -> None:
     We don't require 16x6 specifically, only that:
       (width % 12 == 0), (height % 18 == 0), and (tiles == 96).
     """
-    glyphs = _read_mcm_text(base_mcm)
+    # A0..FF are overwritten below, so don't bother parsing them.
+    glyphs = _read_mcm_text(base_mcm, skip_indices=range(INJECT_START, INJECT_END + 1))
+    glyphs[INJECT_START : INJECT_END + 1] = _encode_logo(logo_png)
+
+    _write_mcm_text(glyphs, out_mcm)
+
+
+def inject_logo_batch(base_mcm: Path, logo_pngs: List[Path], out_dir: Path) -> List[Path]:
+    """
+    Inject each logo into its own copy of base_mcm, writing OUT_DIR/<logo stem>.mcm.
 
+    The base font is parsed once; logos are encoded on a thread pool (the NumPy
+    kernels release the GIL). All logos are validated before any output is
+    written. Returns the written paths in input order.
+    """
+    base = _read_mcm_text(base_mcm, skip_indices=range(INJECT_START, INJECT_END + 1))
+    out_mcms = [out_dir / f"{logo_png.stem}.mcm" for logo_png in logo_pngs]
+    if len(set(out_mcms)) != len(out_mcms):
+        raise ValueError("Logo file names must be unique (outputs are named after them).")
+
+    def encode(logo_png: Path) -> np.ndarray:
+        try:
+            return _encode_logo(logo_png)
+        except (ValueError, OSError) as e:
+            raise ValueError(f"{logo_png}: {e}") from e
+
+    def write(logo_glyphs: np.ndarray, out_mcm: Path) -> None:
+        glyphs = base.copy()
+        glyphs[INJECT_START : INJECT_END + 1] = logo_glyphs
+        _write_mcm_text(glyphs, out_mcm)
+
+    with ThreadPoolExecutor() as pool:
+        # Validate every logo before writing anything, so a bad logo leaves no
+        # partial set of outputs. list() re-raises the first worker error.
+        encoded = list(pool.map(encode, logo_pngs))
+        list(pool.map(write, encoded, out_mcms))
+    return out_mcms
+
+
+def _encode_logo(logo_png: Path) -> np.ndarray:
+    """Load and validate a logo PNG, returning its (96, 64) glyph bytes."""
     logo = Image.open(logo_png).convert("RGB")
     w, h = logo.size
     if w % GLYPH_W != 0 or h % GLYPH_H != 0:
@@ -255,17 +401,8 @@ def inject_logo(base_mcm: Path, logo_png: Path, out_mcm: Path) -> None:
             f"Got {tiles} tiles ({cols}x{rows}) from {w}x{h}."
         )
 
-    # Slice and overwrite glyphs sequentially
-    idx = INJECT_START
-    for r in range(rows):
-        for c in range(cols):
-            x0 = c * GLYPH_W
-            y0 = r * GLYPH_H
-            tile = logo.crop((x0, y0, x0 + GLYPH_W, y0 + GLYPH_H))
-            glyphs[idx] = _tile_to_glyph_bytes(tile)
-            idx += 1
-
-    _write_mcm_text(glyphs, out_mcm)
+    # Slice into tiles sequentially (row-major)
+    return _encode_tiles_to_glyph_bytes(_split_tiles(_rgb_array(logo), rows, cols))
 
 
 def main() -> None:
@@ -277,6 +414,7 @@ examples:
   mcmedit.py mcm2sheet font.mcm sheet.png
   mcmedit.py sheet2mcm sheet.png font.mcm
   mcmedit.py inject-logo font.mcm logo_288x72.png font_with_logo.mcm
+  mcmedit.py inject-logo-batch font.mcm out/ logo_a.png logo_b.png
 """,
     )
 
@@ -315,8 +453,23 @@ example:
     p_c.add_argument("logo_png", type=Path, metavar="LOGO.png")
     p_c.add_argument("out_mcm", type=Path, metavar="OUTPUT.mcm")
 
-    # print
+    # inject-logo-batch
     p_d = sub.add_parser(
+        "inject-logo-batch",
+        help="Inject several logo PNGs into copies of one font (in parallel)",
+        description="""
+Injects each logo into its own copy of the base font, writing OUT_DIR/<logo name>.mcm.
+
+example:
+  mcmedit.py inject-logo-batch base_font.mcm out/ logo_a.png logo_b.png
+""",
+    )
+    p_d.add_argument("base_mcm", type=Path, metavar="BASE_FONT.mcm")
+    p_d.add_argument("out_dir", type=Path, metavar="OUT_DIR")
+    p_d.add_argument("logo_pngs", type=Path, nargs="+", metavar="LOGO.png")
+
+    # print
+    p_e = sub.add_parser(
         "print",
         help="Print the replaceable character set (for copy/paste)",
         description="Print the replaceable characters as a 4-line block for easy copy/paste into Photoshop (or anywhere).",
@@ -352,6 +505,16 @@ example:
         inject_logo(args.base_mcm, args.logo_png, args.out_mcm)
         _ok(f"Wrote {args.out_mcm} (logo injected A0–FF)")
 
+    elif args.cmd == "inject-logo-batch":
+        if not args.base_mcm.exists():
+            _err(f"Base font not found: {args.base_mcm}")
+        for logo_png in args.logo_pngs:
+            if not logo_png.exists():
+                _err(f"Logo PNG not found: {logo_png}")
+        args.out_dir.mkdir(parents=True, exist_ok=True)
+        for out_mcm in inject_logo_batch(args.base_mcm, args.logo_pngs, args.out_dir):
+            _ok(f"Wrote {out_mcm} (logo injected A0–FF)")
+
     else:
         _err("Unknown command", code=2)
 